@@ -9,17 +9,26 @@ Usage:
 Or with key file:
     echo "your_key" > ../secrets/fred-api-key.txt
     python3 build_data.py
+
+Steps whose outputs are still fresh are skipped (raw files whose recorded
+fetched_at is within FETCH_TTL and that hold data, indicators.json newer
+than its inputs). Pass --force to rebuild everything.
 """
 
+import asyncio
+import json
 import os
 import sys
-import subprocess
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 SECRETS_DIR = PROJECT_DIR / "secrets"
+DATA_DIR = PROJECT_DIR / "data"
+
+# Source series update at most daily, so a recent raw fetch is reused as-is
+FETCH_TTL = timedelta(hours=6)
 
 
 def load_env():
@@ -34,48 +43,119 @@ def load_env():
             sys.exit(1)
 
 
-def run_script(name: str) -> bool:
-    """Run a Python script and return success status."""
+async def run_script(name: str) -> bool:
+    """Run a Python script and return success status.
+
+    Output is captured and printed once the script exits, so scripts run
+    concurrently don't interleave their logs. The script's stderr is kept
+    separate and replayed to our stderr under the same banner.
+    """
     script_path = SCRIPT_DIR / name
-    print(f"\n{'='*60}")
-    print(f"Running {name}...")
-    print(f"{'='*60}")
 
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(script_path),
         cwd=str(SCRIPT_DIR),
         env=os.environ.copy(),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
     )
+    output, errors = await proc.communicate()
 
-    if result.returncode != 0:
-        print(f"FAILED: {name} exited with code {result.returncode}", file=sys.stderr)
+    print(f"\n{'='*60}")
+    print(f"{name}")
+    print(f"{'='*60}")
+    sys.stdout.write(output.decode(errors="replace"))
+    sys.stdout.flush()
+    sys.stderr.write(errors.decode(errors="replace"))
+    sys.stderr.flush()
+
+    if proc.returncode != 0:
+        print(f"FAILED: {name} exited with code {proc.returncode}", file=sys.stderr)
         return False
     return True
 
 
-def main():
-    start = datetime.now()
-    print(f"The Displacement Index — Data Build")
-    print(f"Started: {start.isoformat()}")
+def count_observations(data) -> int:
+    """Total of every series' "count" in a raw data file, however it is nested."""
+    if isinstance(data, dict):
+        own = data["count"] if isinstance(data.get("count"), int) else 0
+        return own + sum(count_observations(v) for k, v in data.items() if k != "count")
+    return 0
 
-    load_env()
 
-    # Step 1: Fetch FRED data
-    if not run_script("fetch_fred.py"):
-        sys.exit(1)
+def is_fresh(output: Path, ttl: timedelta) -> bool:
+    """
+    True if output was fetched less than ttl ago and holds data.
+
+    Age comes from the file's recorded fetched_at stamp, not its mtime, since
+    data/*.json are tracked in git and a checkout makes them look brand new.
+    A file where every series came back empty is never fresh.
+    """
+    try:
+        data = json.loads(output.read_bytes())
+        fetched_at = datetime.fromisoformat(data["fetched_at"].replace("Z", "+00:00"))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return False
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    if count_observations(data) == 0:
+        return False
+    return datetime.now(timezone.utc) - fetched_at < ttl
 
-    # Step 2: Fetch WARN/layoff proxy data
-    if not run_script("fetch_warn.py"):
-        print("WARNING: WARN data fetch failed, continuing with FRED only...")
 
-    # Step 2b: Fetch Indeed job postings data
-    if not run_script("fetch_indeed.py"):
+def is_up_to_date(output: Path, inputs: list[Path]) -> bool:
+    """Make-style check: output exists and is newer than every existing input."""
+    if not output.exists():
+        return False
+    built_at = output.stat().st_mtime
+    return all(p.stat().st_mtime <= built_at for p in inputs if p.exists())
+
+
+async def fetch(name: str, output: str, force: bool) -> bool:
+    """Run a fetch script unless its raw output is still within FETCH_TTL."""
+    if not force and is_fresh(DATA_DIR / output, FETCH_TTL):
+        print(f"Skipping {name}: {output} was fetched less than {FETCH_TTL} ago")
+        return True
+    return await run_script(name)
+
+
+async def build(force: bool):
+    # Step 1: Fetch FRED, WARN/layoff proxy and Indeed data in parallel
+    # (independent hosts, so the network stages overlap)
+    fred_ok, warn_ok, indeed_ok = await asyncio.gather(
+        fetch("fetch_fred.py", "fred_raw.json", force),
+        fetch("fetch_warn.py", "warn_raw.json", force),
+        fetch("fetch_indeed.py", "indeed_raw.json", force),
+    )
+
+    if not fred_ok:
+        sys.exit(1)
+    if not warn_ok:
+        print("WARNING: WARN data fetch failed, continuing with FRED only...")
+    if not indeed_ok:
         print("WARNING: Indeed data fetch failed, continuing without it...")
 
-    # Step 3: Compute derived indicators
-    if not run_script("compute_derived.py"):
+    # Step 2: Compute derived indicators (only if an input changed)
+    derived_inputs = [
+        DATA_DIR / "fred_raw.json",
+        DATA_DIR / "warn_raw.json",
+        SCRIPT_DIR / "compute_derived.py",
+    ]
+    if not force and is_up_to_date(DATA_DIR / "indicators.json", derived_inputs):
+        print("Skipping compute_derived.py: indicators.json is up to date")
+    elif not await run_script("compute_derived.py"):
         sys.exit(1)
 
+
+def main():
+    start = datetime.now()
+    print(f"The Displacement Index — Data Build")
+    print(f"Started: {start.isoformat()}")
+
+    load_env()
+
+    asyncio.run(build(force="--force" in sys.argv[1:]))
+
     elapsed = (datetime.now() - start).total_seconds()
     print(f"\n{'='*60}")
     print(f"BUILD COMPLETE in {elapsed:.1f}s")
@@ -15,104 +15,192 @@ Usage:
 """
 
 import json
+import pickle
 import sys
 from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
 
 DATA_DIR = Path(__file__).parent.parent / "data"
+CACHE_DIR = DATA_DIR / ".cache"
 
+# Observations per year, by series frequency
+PERIODS_PER_YEAR = {"monthly": 12, "quarterly": 4, "weekly": 52, "daily": 252}
 
-def load_json(filename: str) -> dict:
-    path = DATA_DIR / filename
-    if not path.exists():
-        print(f"ERROR: {path} not found. Run fetch scripts first.", file=sys.stderr)
-        sys.exit(1)
-    with open(path) as f:
-        return json.load(f)
 
+class Status(IntEnum):
+    """Indicator status, ordered by severity. Written to JSON as its lowercase name."""
+    UNKNOWN = 0
+    NORMAL = 1
+    ELEVATED = 2
+    WARNING = 3
+    CRITICAL = 4
+
+    def __str__(self) -> str:
+        return self.name.lower()
 
-def get_series(fred_data: dict, series_id: str) -> list[dict]:
-    """Extract observations for a series from fred_raw.json."""
-    for chain_link, series_map in fred_data.get("chain_links", {}).items():
-        if series_id in series_map:
-            return series_map[series_id].get("observations", [])
-    return []
+    def __format__(self, spec: str) -> str:
+        return format(str(self), spec)
 
 
-def get_latest(fred_data: dict, series_id: str) -> dict | None:
-    """Get latest observation for a series."""
-    obs = get_series(fred_data, series_id)
-    return obs[-1] if obs else None
+# Composite score contribution per status, indexed by Status
+STATUS_SCORES = (0, 0, 25, 50, 100)
 
+# FRED series the indicators below read; the rest of fred_raw.json is display-only
+USED_SERIES = frozenset({
+    "LNU04032239", "LNU04032237", "CES6054000001", "UNRATE",
+    "PCEC96", "UMCSENT", "RSAFS",
+    "OPHNFB", "LES1252881600Q", "M2V",
+    "BAMLH0A0HYM2", "BAMLH0A3HYC", "DRCLACBS",
+    "DRSFRMACBS",
+})
 
-def pct_change(series: list[dict], periods: int = 1) -> float | None:
+
+def load_json(filename: str, series_ids: frozenset | None = None) -> dict:
+    """
+    Load a data file, reusing the parsed copy pickled by the last run
+    when the file's mtime and size haven't changed.
+
+    For fred_raw.json, series_ids limits chain_links to those series, so
+    the cached copy (and what later runs unpickle) holds only what is used.
+    """
+    path = DATA_DIR / filename
+    if not path.exists():
+        print(f"ERROR: {path} not found. Run fetch scripts first.", file=sys.stderr)
+        sys.exit(1)
+
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size, sorted(series_ids) if series_ids else None)
+    cache_path = CACHE_DIR / f"{path.stem}.pkl"
+
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, data = pickle.load(f)
+            if cached_key == key:
+                return data
+        except Exception:
+            pass  # Stale or unreadable cache, fall through to a fresh parse
+
+    data = json.loads(path.read_bytes())
+    if series_ids and "chain_links" in data:
+        data["chain_links"] = {
+            chain_link: {sid: sdata for sid, sdata in series_map.items() if sid in series_ids}
+            for chain_link, series_map in data["chain_links"].items()
+        }
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(cache_path, "wb") as f:
+        pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+    return data
+
+
+def build_series_index(fred_data: dict) -> dict[str, dict]:
+    """
+    Flatten fred_raw.json's chain links into series_id ->
+    {"frequency": ..., "values": [...]}, values oldest first.
+    """
+    index = {}
+    for series_map in fred_data.get("chain_links", {}).values():
+        for series_id, series_data in series_map.items():
+            observations = series_data.get("observations", [])
+            index[series_id] = {
+                "frequency": series_data.get("frequency", "monthly"),
+                "values": [obs["value"] for obs in observations],
+            }
+    return index
+
+
+def pct_change(values: list[float], periods: int = 1) -> float | None:
     """Calculate percent change over N periods from end of series."""
-    if len(series) < periods + 1:
+    if len(values) < periods + 1:
         return None
-    current = series[-1]["value"]
-    previous = series[-(periods + 1)]["value"]
+    current = values[-1]
+    previous = values[-(periods + 1)]
     if previous == 0:
         return None
     return ((current - previous) / abs(previous)) * 100
 
 
-def yoy_change(series: list[dict], frequency: str = "monthly") -> float | None:
+def yoy_change(values: list[float], frequency: str = "monthly") -> float | None:
     """Calculate year-over-year change."""
-    periods = {"monthly": 12, "quarterly": 4, "weekly": 52, "daily": 252}.get(frequency, 12)
-    return pct_change(series, periods)
+    periods = PERIODS_PER_YEAR.get(frequency, 12)
+    return pct_change(values, periods)
 
 
-def z_score_vs_history(series: list[dict], lookback: int = 60) -> float | None:
+def z_score_vs_history(values: list[float], lookback: int = 60) -> float | None:
     """How many std devs is current value from recent mean."""
-    if len(series) < max(lookback, 10):
-        lookback = len(series)
+    if len(values) < max(lookback, 10):
+        lookback = len(values)
     if lookback < 5:
         return None
 
-    values = [obs["value"] for obs in series[-lookback:]]
-    mean = sum(values) / len(values)
-    variance = sum((v - mean) ** 2 for v in values) / len(values)
+    window = values[-lookback:]
+    mean = sum(window) / lookback
+    variance = sum([(v - mean) ** 2 for v in window]) / lookback
     std = variance ** 0.5
 
     if std == 0:
         return 0.0
 
-    current = series[-1]["value"]
-    return (current - mean) / std
+    return (values[-1] - mean) / std
+
+
+def summarize(values: list[float], frequency: str = "monthly", lookback: int = 60) -> dict:
+    """
+    All per-series statistics in one go: 3-period % change, YoY % change
+    and z-score. The % changes are index reads, so the z-score window is
+    the only pass over the values.
+    """
+    return {
+        "pct_3": pct_change(values, 3),
+        "yoy": yoy_change(values, frequency),
+        "z": z_score_vs_history(values, lookback),
+    }
+
+
+def summarize_series(series_index: dict) -> dict[str, dict]:
+    """Summarize every indexed series once, keyed by series_id."""
+    return {
+        series_id: summarize(series["values"], series["frequency"])
+        for series_id, series in series_index.items()
+    }
 
 
-def classify_status(z_score: float | None, inverted: bool = False) -> str:
+def get_stat(stats: dict, series_id: str, name: str) -> float | None:
+    """Look up one statistic for a series (None if the series is missing)."""
+    return stats.get(series_id, {}).get(name)
+
+
+def classify_status(z_score: float | None, inverted: bool = False) -> Status:
     """
     Classify indicator status based on z-score.
     inverted=True means higher values are BETTER (e.g., consumer sentiment, employment level).
     """
     if z_score is None:
-        return "unknown"
+        return Status.UNKNOWN
 
     if inverted:
         z_score = -z_score
 
     if z_score >= 2.0:
-        return "critical"
+        return Status.CRITICAL
     elif z_score >= 1.0:
-        return "warning"
+        return Status.WARNING
     elif z_score >= 0.5:
-        return "elevated"
+        return Status.ELEVATED
     else:
-        return "normal"
+        return Status.NORMAL
 
 
-def compute_ghost_gdp(fred_data: dict) -> dict:
+def compute_ghost_gdp(stats: dict) -> dict:
     """
     Ghost GDP = productivity rising while wages stagnate/fall.
     Score = productivity YoY change minus real wage YoY change.
     Positive = ghost GDP (output growing faster than wages).
     """
-    productivity = get_series(fred_data, "OPHNFB")
-    wages = get_series(fred_data, "LES1252881600Q")
-
-    prod_yoy = yoy_change(productivity, "quarterly")
-    wage_yoy = yoy_change(wages, "quarterly")
+    prod_yoy = get_stat(stats, "OPHNFB", "yoy")
+    wage_yoy = get_stat(stats, "LES1252881600Q", "yoy")
 
     ghost_score = None
     if prod_yoy is not None and wage_yoy is not None:
@@ -130,18 +218,14 @@ def compute_ghost_gdp(fred_data: dict) -> dict:
     }
 
 
-def compute_displacement_velocity(fred_data: dict) -> dict:
+def compute_displacement_velocity(stats: dict) -> dict:
     """
     How fast is white-collar unemployment rising vs overall?
     Ratio of white-collar unemployment change to overall unemployment change.
     """
-    prof_biz = get_series(fred_data, "LNU04032239")
-    info = get_series(fred_data, "LNU04032237")
-    overall = get_series(fred_data, "UNRATE")
-
-    prof_change = pct_change(prof_biz, 3) if len(prof_biz) >= 4 else None  # 3-month change
-    info_change = pct_change(info, 3) if len(info) >= 4 else None
-    overall_change = pct_change(overall, 3) if len(overall) >= 4 else None
+    prof_change = get_stat(stats, "LNU04032239", "pct_3")  # 3-month change
+    info_change = get_stat(stats, "LNU04032237", "pct_3")
+    overall_change = get_stat(stats, "UNRATE", "pct_3")
 
     # Average white-collar change
     wc_changes = [c for c in [prof_change, info_change] if c is not None]
@@ -166,15 +250,15 @@ def compute_displacement_velocity(fred_data: dict) -> dict:
     }
 
 
-def compute_chain_link_status(fred_data: dict, warn_data: dict) -> dict:
+def compute_chain_link_status(stats: dict, warn_data: dict) -> dict:
     """Compute status for each of the 5 chain links."""
 
     links = {}
 
     # Link 1: White-Collar Displacement
-    prof_z = z_score_vs_history(get_series(fred_data, "LNU04032239"))
-    info_z = z_score_vs_history(get_series(fred_data, "LNU04032237"))
-    emp_z = z_score_vs_history(get_series(fred_data, "CES6054000001"))
+    prof_z = get_stat(stats, "LNU04032239", "z")
+    info_z = get_stat(stats, "LNU04032237", "z")
+    emp_z = get_stat(stats, "CES6054000001", "z")
 
     z_scores_1 = [z for z in [prof_z, info_z] if z is not None]
     # Employment is inverted (lower = worse)
@@ -194,9 +278,9 @@ def compute_chain_link_status(fred_data: dict, warn_data: dict) -> dict:
     }
 
     # Link 2: Consumer Spending
-    pce_z = z_score_vs_history(get_series(fred_data, "PCEC96"))
-    sent_z = z_score_vs_history(get_series(fred_data, "UMCSENT"))
-    retail_z = z_score_vs_history(get_series(fred_data, "RSAFS"))
+    pce_z = get_stat(stats, "PCEC96", "z")
+    sent_z = get_stat(stats, "UMCSENT", "z")
+    retail_z = get_stat(stats, "RSAFS", "z")
 
     # These are inverted — lower values = worse
     z_scores_2 = [z for z in [pce_z, sent_z, retail_z] if z is not None]
@@ -214,7 +298,7 @@ def compute_chain_link_status(fred_data: dict, warn_data: dict) -> dict:
     }
 
     # Link 3: Ghost GDP
-    m2v_z = z_score_vs_history(get_series(fred_data, "M2V"))
+    m2v_z = get_stat(stats, "M2V", "z")
     # M2V declining = bad (inverted)
     links["ghost_gdp"] = {
         "name": "Ghost GDP",
@@ -226,9 +310,9 @@ def compute_chain_link_status(fred_data: dict, warn_data: dict) -> dict:
     }
 
     # Link 4: Credit Stress
-    hy_z = z_score_vs_history(get_series(fred_data, "BAMLH0A0HYM2"))
-    ccc_z = z_score_vs_history(get_series(fred_data, "BAMLH0A3HYC"))
-    delinq_z = z_score_vs_history(get_series(fred_data, "DRCLACBS"))
+    hy_z = get_stat(stats, "BAMLH0A0HYM2", "z")
+    ccc_z = get_stat(stats, "BAMLH0A3HYC", "z")
+    delinq_z = get_stat(stats, "DRCLACBS", "z")
 
     z_scores_4 = [z for z in [hy_z, ccc_z, delinq_z] if z is not None]
     avg_z_4 = sum(z_scores_4) / len(z_scores_4) if z_scores_4 else None
@@ -245,7 +329,7 @@ def compute_chain_link_status(fred_data: dict, warn_data: dict) -> dict:
     }
 
     # Link 5: Mortgage Stress
-    mort_z = z_score_vs_history(get_series(fred_data, "DRSFRMACBS"))
+    mort_z = get_stat(stats, "DRSFRMACBS", "z")
     links["mortgage_stress"] = {
         "name": "Mortgage & Housing Stress",
         "status": classify_status(mort_z),
@@ -263,18 +347,14 @@ def compute_composite_index(chain_links: dict) -> dict:
     Composite Displacement Index: 0-100 scale.
     Based on chain link statuses.
     """
-    status_scores = {"normal": 0, "elevated": 25, "warning": 50, "critical": 100, "unknown": 0}
-
-    scores = []
-    for link_id, link_data in chain_links.items():
-        scores.append(status_scores.get(link_data["status"], 0))
+    scores = [STATUS_SCORES[link_data["status"]] for link_data in chain_links.values()]
 
     composite = sum(scores) / len(scores) if scores else 0
 
     # Count links in each status
     status_counts = {}
     for link_data in chain_links.values():
-        s = link_data["status"]
+        s = str(link_data["status"])
         status_counts[s] = status_counts.get(s, 0) + 1
 
     return {
@@ -285,6 +365,17 @@ def compute_composite_index(chain_links: dict) -> dict:
     }
 
 
+def _status_names(obj):
+    """Recursively replace Status values with their names for JSON output."""
+    if isinstance(obj, Status):
+        return str(obj)
+    if isinstance(obj, dict):
+        return {k: _status_names(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_status_names(v) for v in obj]
+    return obj
+
+
 def _interpret_composite(score: float) -> str:
     if score >= 75:
         return "Critical: Multiple chain links showing severe stress"
@@ -298,18 +389,19 @@ def _interpret_composite(score: float) -> str:
 
 def main():
     print("Loading raw data...")
-    fred_data = load_json("fred_raw.json")
+    fred_data = load_json("fred_raw.json", series_ids=USED_SERIES)
+    stats = summarize_series(build_series_index(fred_data))
     warn_data = load_json("warn_raw.json") if (DATA_DIR / "warn_raw.json").exists() else {}
 
     print("Computing derived indicators...")
-    ghost_gdp = compute_ghost_gdp(fred_data)
+    ghost_gdp = compute_ghost_gdp(stats)
     print(f"  Ghost GDP Score: {ghost_gdp['value']} ({ghost_gdp['status']})")
 
-    displacement_velocity = compute_displacement_velocity(fred_data)
+    displacement_velocity = compute_displacement_velocity(stats)
     print(f"  Displacement Velocity: {displacement_velocity['value']} ({displacement_velocity['status']})")
 
     print("Computing chain link statuses...")
-    chain_links = compute_chain_link_status(fred_data, warn_data)
+    chain_links = compute_chain_link_status(stats, warn_data)
     for link_id, link_data in chain_links.items():
         print(f"  {link_data['name']}: {link_data['status']} (z={link_data['z_score']})")
 
@@ -331,7 +423,7 @@ def main():
 
     out_path = DATA_DIR / "indicators.json"
     with open(out_path, "w") as f:
-        json.dump(output, f, indent=2)
+        json.dump(_status_names(output), f, indent=2)
     print(f"\nWritten to {out_path}")
 
 
@@ -12,17 +12,41 @@ import os
 import sys
 import json
 import time
-import urllib.request
+import threading
 import urllib.error
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from http_cache import cached_get
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
 API_KEY = os.environ.get("FRED_API_KEY")
 BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
 
+# Default: 5 years of history for context, pinned to the start of the month
+# so request URLs (and their HTTP cache entries) stay stable within a month
+DEFAULT_START = (datetime.now() - timedelta(days=5 * 365)).strftime("%Y-%m-01")
+
+# Query parameters that are the same for every series, encoded once per run
+STATIC_QS = urllib.parse.urlencode({
+    "api_key": API_KEY or "",
+    "file_type": "json",
+    "sort_order": "asc",
+})
+
+# FRED allows 120 req/min; stay under it while fetching concurrently
+MAX_WORKERS = 8
+REQUESTS_PER_MINUTE = 110
+
+# Start times of the most recent requests (sliding one-minute window)
+_request_times = deque(maxlen=REQUESTS_PER_MINUTE)
+_throttle_lock = threading.Lock()
+
 # All FRED series we track, grouped by chain link
 SERIES = {
     # Chain Link 1: White-Collar Displacement
@@ -136,32 +160,25 @@ SERIES = {
 
 
 def fetch_series(series_id: str, observation_start: str = None) -> list[dict]:
-    """Fetch observations for a single FRED series."""
-    if not observation_start:
-        # Default: 5 years of history for context
-        observation_start = (datetime.now() - timedelta(days=5 * 365)).strftime("%Y-%m-%d")
-
-    params = {
-        "series_id": series_id,
-        "api_key": API_KEY,
-        "file_type": "json",
-        "observation_start": observation_start,
-        "sort_order": "asc",
-    }
+    """
+    Fetch observations for a single FRED series.
 
-    url = BASE_URL + "?" + "&".join(f"{k}={v}" for k, v in params.items())
+    fred/series/observations accepts exactly one series_id and FRED has no
+    multi-series observations endpoint, so requests can't be batched;
+    fetch_all overlaps them instead.
+    """
+    start = urllib.parse.quote(observation_start or DEFAULT_START, safe="")
+    url = f"{BASE_URL}?series_id={urllib.parse.quote(series_id, safe='')}&observation_start={start}&{STATIC_QS}"
 
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "DisplacementIndex/1.0"})
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode())
-            observations = data.get("observations", [])
-            # Clean: remove entries with "." value (FRED uses "." for missing)
-            return [
-                {"date": obs["date"], "value": float(obs["value"])}
-                for obs in observations
-                if obs.get("value") and obs["value"] != "."
-            ]
+        data = json.loads(cached_get(url, timeout=30, cache_key=f"fred_{series_id}"))
+        # Clean: remove entries with "." value (FRED uses "." for missing).
+        # Single pass, reading each value once.
+        return [
+            {"date": obs["date"], "value": float(value)}
+            for obs in data.get("observations", [])
+            if (value := obs.get("value")) and value != "."
+        ]
     except urllib.error.HTTPError as e:
         print(f"  ERROR fetching {series_id}: HTTP {e.code} - {e.reason}", file=sys.stderr)
         return []
@@ -170,25 +187,56 @@ def fetch_series(series_id: str, observation_start: str = None) -> list[dict]:
         return []
 
 
+def throttle():
+    """Block only if another request would exceed the per-minute quota."""
+    with _throttle_lock:
+        now = time.monotonic()
+        start = now
+        if len(_request_times) == REQUESTS_PER_MINUTE:
+            # Window is full: wait until its oldest request is a minute old
+            start = max(now, _request_times[0] + 60)
+        _request_times.append(start)
+    if start > now:
+        time.sleep(start - now)
+
+
+def fetch_series_throttled(series_id: str) -> list[dict]:
+    """Fetch a series once the rate limiter allows another request."""
+    throttle()
+    return fetch_series(series_id)
+
+
 def fetch_all() -> dict:
-    """Fetch all series, return structured data."""
+    """Fetch all series concurrently, return structured data."""
     result = {
         "fetched_at": datetime.utcnow().isoformat() + "Z",
         "chain_links": {},
     }
 
     total_series = sum(len(s) for s in SERIES.values())
-    fetched = 0
+    print(f"Fetching {total_series} series ({MAX_WORKERS} workers)...")
+
+    # Network-bound: threads overlap the HTTP round-trips
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {
+            pool.submit(fetch_series_throttled, series_id): (chain_link, series_id, meta)
+            for chain_link, series_map in SERIES.items()
+            for series_id, meta in series_map.items()
+        }
+        fetched_series = {}
+
+        # Report progress as each request completes
+        for fetched, future in enumerate(as_completed(futures), start=1):
+            _, series_id, meta = futures[future]
+            fetched_series[series_id] = future.result()
+            print(f"[{fetched}/{total_series}] Fetched {series_id} ({meta['name']})")
 
+    # Assemble in SERIES order, whatever order the requests finished in
     for chain_link, series_map in SERIES.items():
         result["chain_links"][chain_link] = {}
 
         for series_id, meta in series_map.items():
-            fetched += 1
-            print(f"[{fetched}/{total_series}] Fetching {series_id} ({meta['name']})...")
-
-            observations = fetch_series(series_id)
-
+            observations = fetched_series[series_id]
             result["chain_links"][chain_link][series_id] = {
                 **meta,
                 "series_id": series_id,
@@ -197,9 +245,6 @@ def fetch_all() -> dict:
                 "count": len(observations),
             }
 
-            # Respect FRED rate limit (120 req/min, but be polite)
-            time.sleep(0.6)
-
     return result
 
 
@@ -214,8 +259,8 @@ def main():
 
     # Write combined file
     out_path = DATA_DIR / "fred_raw.json"
-    with open(out_path, "w") as f:
-        json.dump(data, f, indent=2)
+    # Machine-consumed raw cache: write compact (no indent) for speed and size
+    out_path.write_text(json.dumps(data, separators=(",", ":")))
     print(f"\nWritten to {out_path}")
 
     # Summary
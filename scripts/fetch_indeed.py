@@ -13,10 +13,13 @@ import csv
 import io
 import json
 import sys
-import urllib.request
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+from http_cache import cached_get, drop_cached
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -34,30 +37,66 @@ TARGET_SECTORS = [
 ]
 
 
-def fetch_csv(url: str) -> list[dict]:
-    """Fetch and parse a CSV from URL."""
+def fetch_csv(url: str) -> Iterator[list[str]]:
+    """
+    Fetch a CSV from URL and return a row iterator (header row first).
+
+    Rows are split lazily so callers can filter them without materializing
+    the whole file as dicts. A body that isn't valid UTF-8 or CSV is logged
+    and dropped from the HTTP cache, so the next run downloads it afresh.
+    """
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "DisplacementIndex/1.0"})
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            text = resp.read().decode("utf-8")
-            reader = csv.DictReader(io.StringIO(text))
-            return list(reader)
+        body = cached_get(url, timeout=60)
     except Exception as e:
         print(f"  ERROR fetching {url}: {e}", file=sys.stderr)
-        return []
+        return iter(())
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        print(f"  ERROR decoding {url}: {e}", file=sys.stderr)
+        drop_cached(url)
+        return iter(())
+    return parse_rows(url, text)
+
+
+def parse_rows(url: str, text: str) -> Iterator[list[str]]:
+    """Yield CSV rows from text; on a parse error, drop the cache entry and re-raise."""
+    try:
+        yield from csv.reader(io.StringIO(text, newline=""))
+    except csv.Error as e:
+        print(f"  ERROR parsing {url}: {e}", file=sys.stderr)
+        drop_cached(url)
+        raise
 
 
-def process_aggregate(rows: list[dict]) -> dict:
+def column_getter(header: list[str], name: str):
+    """Return a function reading column `name` from a row ("" if absent)."""
+    if name not in header:
+        return lambda row: ""
+    idx = header.index(name)
+    return lambda row: row[idx] if idx < len(row) else ""
+
+
+def process_aggregate(rows: Iterator[list[str]]) -> dict:
     """Process aggregate US job postings index."""
     observations = []
-    for row in rows:
-        date = row.get("date", "")
-        value = row.get("indeed_job_postings_index_SA") or row.get("indeed_job_postings_index")
-        if date and value:
-            try:
-                observations.append({"date": date, "value": float(value)})
-            except ValueError:
-                continue
+    try:
+        header = next(rows, [])
+        get_date = column_getter(header, "date")
+        get_sa = column_getter(header, "indeed_job_postings_index_SA")
+        get_nsa = column_getter(header, "indeed_job_postings_index")
+
+        for row in rows:
+            date = get_date(row)
+            value = get_sa(row) or get_nsa(row)
+            if date and value:
+                try:
+                    observations.append({"date": date, "value": float(value)})
+                except ValueError:
+                    continue
+    except csv.Error:
+        # Malformed download (already logged); publish nothing rather than a partial series
+        observations = []
 
     # Keep last 2 years (daily data is huge)
     if len(observations) > 730:
@@ -74,31 +113,39 @@ def process_aggregate(rows: list[dict]) -> dict:
     }
 
 
-def process_sectors(rows: list[dict]) -> dict:
+def process_sectors(rows: Iterator[list[str]]) -> dict:
     """Process sector-level postings, filtering to target sectors."""
     sectors = {}
+    try:
+        header = next(rows, [])
+        get_sector = column_getter(header, "display_name")
+        get_variable = column_getter(header, "variable")
+        get_date = column_getter(header, "date")
+        get_value = column_getter(header, "indeed_job_postings_index")
+
+        for row in rows:
+            sector = get_sector(row)
+            if sector not in TARGET_SECTORS:
+                continue
+            if get_variable(row) != "total postings":
+                continue
 
-    for row in rows:
-        sector = row.get("display_name", "")
-        variable = row.get("variable", "")
-        if sector not in TARGET_SECTORS:
-            continue
-        if variable != "total postings":
-            continue
-
-        date = row.get("date", "")
-        value = row.get("indeed_job_postings_index")
-        if not date or not value:
-            continue
+            date = get_date(row)
+            value = get_value(row)
+            if not date or not value:
+                continue
 
-        try:
-            val = float(value)
-        except ValueError:
-            continue
+            try:
+                val = float(value)
+            except ValueError:
+                continue
 
-        if sector not in sectors:
-            sectors[sector] = []
-        sectors[sector].append({"date": date, "value": val})
+            if sector not in sectors:
+                sectors[sector] = []
+            sectors[sector].append({"date": date, "value": val})
+    except csv.Error:
+        # Malformed download (already logged); publish nothing rather than partial sectors
+        sectors = {}
 
     result = {}
     for sector, obs in sectors.items():
@@ -120,15 +167,20 @@ def process_sectors(rows: list[dict]) -> dict:
 def main():
     print("Fetching Indeed Hiring Lab data...")
 
+    # Both CSVs are independent downloads, so fetch them in parallel
+    print("  Fetching aggregate US and sector-level postings...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        agg_future = pool.submit(fetch_csv, f"{BASE_URL}/aggregate_job_postings_US.csv")
+        sector_future = pool.submit(fetch_csv, f"{BASE_URL}/job_postings_by_sector_US.csv")
+        agg_rows = agg_future.result()
+        sector_rows = sector_future.result()
+
     # Aggregate
-    print("  Fetching aggregate US postings...")
-    agg_rows = fetch_csv(f"{BASE_URL}/aggregate_job_postings_US.csv")
     aggregate = process_aggregate(agg_rows)
-    print(f"  Aggregate: {aggregate['count']} obs, latest = {aggregate.get('latest', {}).get('date', 'N/A')}: {aggregate.get('latest', {}).get('value', 'N/A')}")
+    latest = aggregate["latest"] or {}
+    print(f"  Aggregate: {aggregate['count']} obs, latest = {latest.get('date', 'N/A')}: {latest.get('value', 'N/A')}")
 
     # Sectors
-    print("  Fetching sector-level postings...")
-    sector_rows = fetch_csv(f"{BASE_URL}/job_postings_by_sector_US.csv")
     sectors = process_sectors(sector_rows)
     for name, data in sectors.items():
         print(f"  {name}: {data['count']} obs, latest = {data.get('latest', {}).get('value', 'N/A')}")
@@ -142,8 +194,8 @@ def main():
     }
 
     out_path = DATA_DIR / "indeed_raw.json"
-    with open(out_path, "w") as f:
-        json.dump(result, f, indent=2)
+    # Machine-consumed raw cache: write compact (no indent) for speed and size
+    out_path.write_text(json.dumps(result, separators=(",", ":")))
     print(f"\nWritten to {out_path}")
 
 
@@ -12,15 +12,38 @@ Usage:
     python3 fetch_warn.py
 """
 
+import functools
 import json
+import os
 import sys
-import urllib.request
-import urllib.error
-from datetime import datetime
+import tempfile
+import urllib.parse
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
+from http_cache import USER_AGENT, http_get
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
+CACHE_DIR = DATA_DIR / ".cache"
+
+# Constant host/path/options baked in once; only the per-call values are filled
+FRED_URL_TEMPLATE = (
+    "https://api.stlouisfed.org/fred/series/observations"
+    "?series_id={series_id}&api_key={api_key}"
+    "&file_type=json&observation_start={start}&sort_order=asc"
+)
+
+# Claims are revised after first release, so each incremental fetch
+# re-requests this much recent history on top of the cached series
+REVISION_WINDOW = timedelta(days=56)
+
+# Revisions can also reach back years (e.g. annual seasonal-factor updates to
+# SA claims), so the full history is re-fetched once the cached copy is this old
+FULL_REFETCH_AFTER = timedelta(days=7)
 
 # FRED series for mass layoff proxy data
 # These are available without WARN-specific API keys
@@ -39,87 +62,231 @@ WARN_PROXY_SERIES = {
     },
 }
 
-FRED_API_KEY = None
-
-def try_load_fred_key():
-    """Try to load FRED API key from env or secrets file."""
-    import os
-    global FRED_API_KEY
-    FRED_API_KEY = os.environ.get("FRED_API_KEY")
-    if not FRED_API_KEY:
+@functools.lru_cache(maxsize=1)
+def try_load_fred_key() -> str | None:
+    """Try to load FRED API key from env or secrets file (read once per process)."""
+    api_key = os.environ.get("FRED_API_KEY")
+    if not api_key:
         key_file = Path(__file__).parent.parent / "secrets" / "fred-api-key.txt"
         if key_file.exists():
-            FRED_API_KEY = key_file.read_text().strip()
-    return FRED_API_KEY
+            api_key = key_file.read_text().strip()
+    return api_key
+
+
+def load_cached_series(series_id: str, observation_start: str) -> dict | None:
+    """
+    Previously fetched columns for a series, if cached for the same start date.
+
+    Any unreadable or malformed cache (bad JSON, mismatched columns, a bad
+    date or stamp) is treated as absent, so the series is simply re-fetched.
+    full_fetch_at comes back as an aware datetime, or None if never recorded.
+    """
+    cache_path = CACHE_DIR / f"{series_id}.json"
+    try:
+        cached = json.loads(cache_path.read_bytes())
+        if cached.get("observation_start") != observation_start:
+            return None
+        dates = cached["dates"]
+        values = array("d", cached["values"])
+        if not isinstance(dates, list) or len(dates) != len(values):
+            return None
+        if dates:
+            date.fromisoformat(dates[-1])
+        full_fetch_at = cached.get("full_fetch_at")
+        if full_fetch_at is not None:
+            full_fetch_at = datetime.fromisoformat(full_fetch_at)
+            if full_fetch_at.tzinfo is None:
+                full_fetch_at = full_fetch_at.replace(tzinfo=timezone.utc)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        print(f"  Ignoring unusable cache for {series_id}: {e}", file=sys.stderr)
+        return None
+    return {**cached, "values": values, "full_fetch_at": full_fetch_at}
+
+
+def write_atomic(path: Path, buf: bytes):
+    """
+    Write buf to path with one write(2) to a uniquely named temp file in the
+    same directory, then rename it over the target. Readers (e.g. a concurrent
+    compute_derived) never see a partial file, and overlapping runs never
+    share a temp file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        try:
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates files 0600
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def save_cached_series(series_id: str, cached: dict):
+    """
+    Write a series cache atomically, so concurrent runs never see a partial file.
+    The cache is only an optimization: a failed write is logged, not raised.
+    """
+    payload = {**cached, "values": cached["values"].tolist()}
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        write_atomic(CACHE_DIR / f"{series_id}.json", json.dumps(payload).encode())
+    except OSError as e:
+        print(f"  WARNING: could not cache {series_id}: {e}", file=sys.stderr)
+
+
+def empty_series() -> dict:
+    """Column layout for a series with no observations."""
+    return {"dates": [], "values": array("d")}
+
+
+def fetch_fred_series(series_id: str, api_key: str, observation_start: str = "2020-01-01") -> dict:
+    """
+    Fetch a single FRED series (reusable from fetch_fred.py logic).
+
+    Returns parallel columns: {"dates": [...], "values": array("d")}, with
+    values stored as C doubles rather than one dict per observation.
+
+    Series are cached in data/.cache/<series_id>.json; later runs only
+    request the tail (last cached date minus REVISION_WINDOW) and splice it
+    onto the cached history, until the last full fetch is older than
+    FULL_REFETCH_AFTER. If a request fails, the cached series is returned.
+    """
+    if not api_key:
+        return empty_series()
 
+    now = datetime.now(timezone.utc)
+    cached = load_cached_series(series_id, observation_start)
+    full_fetch_at = cached["full_fetch_at"] if cached else None
+    full_fetch = (
+        not cached
+        or not cached["dates"]
+        or not full_fetch_at
+        or now - full_fetch_at >= FULL_REFETCH_AFTER
+    )
 
-def fetch_fred_series(series_id: str, observation_start: str = "2020-01-01") -> list[dict]:
-    """Fetch a single FRED series (reusable from fetch_fred.py logic)."""
-    if not FRED_API_KEY:
-        return []
+    request_start = observation_start
+    if full_fetch:
+        full_fetch_at = now
+    else:
+        last_date = date.fromisoformat(cached["dates"][-1])
+        request_start = max(observation_start, (last_date - REVISION_WINDOW).isoformat())
 
-    url = (
-        f"https://api.stlouisfed.org/fred/series/observations"
-        f"?series_id={series_id}&api_key={FRED_API_KEY}"
-        f"&file_type=json&observation_start={observation_start}&sort_order=asc"
+    url = FRED_URL_TEMPLATE.format(
+        series_id=urllib.parse.quote(series_id, safe=""),
+        api_key=urllib.parse.quote(api_key, safe=""),
+        start=request_start,
     )
 
+    headers = {"User-Agent": USER_AGENT}
+    # Validators only apply to the same request; the tail URL moves as data arrives
+    if cached and cached.get("request_start") == request_start:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "DisplacementIndex/1.0"})
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode())
-            return [
-                {"date": obs["date"], "value": float(obs["value"])}
-                for obs in data.get("observations", [])
-                if obs.get("value") and obs["value"] != "."
-            ]
+        # Keep-alive connection: every series hits api.stlouisfed.org
+        status, resp_headers, body = http_get(url, headers, timeout=30)
+        if status == 304 and cached:
+            return {"dates": cached["dates"], "values": cached["values"]}
+        # The observations endpoint only serves JSON/XML inline (CSV/XLSX
+        # come zipped), so parse the raw bytes directly, with no decode copy
+        data = json.loads(body)
+        # "." marks a missing value
+        fresh_dates = []
+        fresh_values = array("d")
+        for obs in data.get("observations", []):
+            if (value := obs.get("value")) and value != ".":
+                fresh_values.append(float(value))
+                fresh_dates.append(obs["date"])
     except Exception as e:
         print(f"  ERROR fetching {series_id}: {e}", file=sys.stderr)
-        return []
+        if cached:
+            print(f"  Using cached {series_id} ({len(cached['dates'])} obs)", file=sys.stderr)
+            return {"dates": cached["dates"], "values": cached["values"]}
+        return empty_series()
+
+    # Cached history before the re-requested window (dates are ascending), then the fresh tail
+    series = {"dates": fresh_dates, "values": fresh_values}
+    if cached and not full_fetch:
+        cut = bisect_left(cached["dates"], request_start)
+        series = {
+            "dates": cached["dates"][:cut] + fresh_dates,
+            "values": cached["values"][:cut] + fresh_values,
+        }
 
+    save_cached_series(series_id, {
+        "observation_start": observation_start,
+        "request_start": request_start,
+        "full_fetch_at": full_fetch_at.isoformat(),
+        "etag": resp_headers.get("ETag"),
+        "last_modified": resp_headers.get("Last-Modified"),
+        **series,
+    })
+    return series
 
-def fetch_layoff_claims() -> dict:
+
+def fetch_layoff_claims(api_key: str, fetched_at: str) -> dict:
     """Fetch initial + continued claims from FRED as layoff proxy."""
     result = {
-        "fetched_at": datetime.utcnow().isoformat() + "Z",
+        "fetched_at": fetched_at,
         "source": "FRED (BLS via DOL)",
         "series": {},
     }
 
+    # Network-bound: fetch all series concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(WARN_PROXY_SERIES))) as pool:
+        futures = {}
+        for series_id, meta in WARN_PROXY_SERIES.items():
+            print(f"  Fetching {series_id} ({meta['name']})...")
+            futures[series_id] = pool.submit(fetch_fred_series, series_id, api_key)
+
     for series_id, meta in WARN_PROXY_SERIES.items():
-        print(f"  Fetching {series_id} ({meta['name']})...")
-        observations = fetch_fred_series(series_id)
+        series = futures[series_id].result()
+        dates, values = series["dates"], series["values"]
+        # warn_raw.json keeps the same observations layout as the other raw files
         result["series"][series_id] = {
             **meta,
             "series_id": series_id,
-            "observations": observations,
-            "latest": observations[-1] if observations else None,
-            "count": len(observations),
+            "observations": [{"date": d, "value": v} for d, v in zip(dates, values)],
+            "latest": {"date": dates[-1], "value": values[-1]} if dates else None,
+            "count": len(dates),
         }
 
     return result
 
 
 def main():
-    try_load_fred_key()
+    api_key = try_load_fred_key()
 
-    if not FRED_API_KEY:
+    if not api_key:
         print("WARNING: No FRED_API_KEY — can't fetch claims data.", file=sys.stderr)
         print("  Set FRED_API_KEY env var or put key in secrets/fred-api-key.txt", file=sys.stderr)
         sys.exit(1)
 
+    # One timestamp per run, shared by everything written below
+    fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
     print("Fetching layoff proxy data (initial + continued claims)...")
-    data = fetch_layoff_claims()
+    data = fetch_layoff_claims(api_key, fetched_at=fetched_at)
 
     out_path = DATA_DIR / "warn_raw.json"
-    with open(out_path, "w") as f:
-        json.dump(data, f, indent=2)
-    print(f"Written to {out_path}")
+    write_atomic(out_path, json.dumps(data, separators=(",", ":")).encode())
 
+    # Build the summary first and emit it in one write
+    lines = [f"Written to {out_path}"]
     for series_id, series_data in data["series"].items():
         latest = series_data.get("latest")
         latest_str = f"{latest['date']}: {latest['value']:,.0f}" if latest else "NO DATA"
-        print(f"  {series_id}: {series_data['count']} obs, latest = {latest_str}")
+        lines.append(f"  {series_id}: {series_data['count']} obs, latest = {latest_str}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
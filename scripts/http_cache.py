@@ -0,0 +1,138 @@
+"""
+Small on-disk HTTP cache shared by the fetch scripts.
+
+Each response body is stored in data/.http_cache/ next to its ETag and
+Last-Modified headers. Later requests for the same URL send
+If-None-Match / If-Modified-Since, and a 304 is answered from disk
+instead of re-downloading the full history.
+
+Requests go over persistent keep-alive connections (one per host per
+thread), so a run of many calls to the same API pays for a single
+TCP + TLS handshake instead of one per request.
+"""
+
+import hashlib
+import http.client
+import json
+import threading
+import urllib.error
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / ".http_cache"
+
+USER_AGENT = "DisplacementIndex/1.0"
+
+MAX_REDIRECTS = 5
+
+# http.client connections aren't thread-safe, so each worker thread keeps its own
+_local = threading.local()
+
+
+def _connection(scheme: str, host: str, timeout: int) -> http.client.HTTPConnection:
+    """Return this thread's open connection to host, creating it if needed."""
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+    conn = _local.connections.get((scheme, host))
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(host, timeout=timeout)
+        _local.connections[(scheme, host)] = conn
+    return conn
+
+
+def _request(url: str, headers: dict, timeout: int) -> tuple[int, str, http.client.HTTPMessage, bytes]:
+    """One GET over a pooled connection, retrying once if the server closed it."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    for attempt in range(2):
+        conn = _connection(parts.scheme, parts.netloc, timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            return resp.status, resp.reason, resp.headers, resp.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # Idle keep-alive connection was dropped; reconnect and try again
+            conn.close()
+            if attempt:
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+
+def http_get(url: str, headers: dict, timeout: int = 30) -> tuple[int, http.client.HTTPMessage, bytes]:
+    """
+    GET a URL over a keep-alive connection, following redirects.
+    Returns (status, headers, body) for 2xx/304; raises HTTPError otherwise.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        status, reason, resp_headers, body = _request(url, headers, timeout)
+        if status in (301, 302, 303, 307, 308) and resp_headers.get("Location"):
+            url = urljoin(url, resp_headers["Location"])
+            continue
+        if status == 304 or 200 <= status < 300:
+            return status, resp_headers, body
+        raise urllib.error.HTTPError(url, status, reason, resp_headers, None)
+    raise urllib.error.HTTPError(url, status, "Too many redirects", resp_headers, None)
+
+
+def _cache_paths(url: str, cache_key: str | None) -> tuple[Path, Path]:
+    """Return the (meta, body) paths of a URL's cache entry."""
+    key = cache_key or hashlib.sha1(url.encode()).hexdigest()
+    return CACHE_DIR / f"{key}.meta", CACHE_DIR / f"{key}.body"
+
+
+def drop_cached(url: str, cache_key: str | None = None) -> None:
+    """Delete a URL's cache entry, e.g. after its body turned out to be unusable."""
+    for path in _cache_paths(url, cache_key):
+        path.unlink(missing_ok=True)
+
+
+def cached_get(url: str, timeout: int = 30, cache_key: str | None = None) -> bytes:
+    """
+    GET a URL, revalidating against the on-disk cache. Raises on HTTP errors.
+
+    cache_key names the cache entry (default: a hash of the URL). Pass a stable
+    key when the URL varies over time, so a new URL overwrites the previous
+    entry instead of adding another; validators are only sent while the stored
+    entry was fetched from the same URL.
+    """
+    url_hash = hashlib.sha1(url.encode()).hexdigest()
+    meta_path, body_path = _cache_paths(url, cache_key)
+
+    headers = {"User-Agent": USER_AGENT}
+    cached = False
+    if meta_path.exists() and body_path.exists():
+        meta = json.loads(meta_path.read_text())
+        cached = meta.get("url_hash", url_hash) == url_hash
+        if cached and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if cached and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    status, resp_headers, body = http_get(url, headers, timeout)
+    if status == 304:
+        if cached:
+            return body_path.read_bytes()
+        raise urllib.error.HTTPError(url, status, "Not Modified without a cached body", resp_headers, None)
+
+    etag = resp_headers.get("ETag")
+    last_modified = resp_headers.get("Last-Modified")
+
+    # Only worth keeping if the server gave us something to revalidate with
+    if etag or last_modified:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(body)
+        meta_path.write_text(json.dumps({"url_hash": url_hash, "etag": etag, "last_modified": last_modified}))
+    else:
+        # Drop a superseded entry rather than leaving it behind
+        drop_cached(url, cache_key)
+
+    return body